@@ -7,6 +7,7 @@ from acados_template import (
 )
 from utils.plotter import plotter
 import os
+import hashlib
 import pickle
 from tqdm import tqdm
 
@@ -54,6 +55,8 @@ class Params:
         self.dt = 0.02                                  # Control time step [s]
         self.dtSim = 0.0001                             # Integration time step [s]
         self.nsub = int(self.dt / self.dtSim)           # Sub-steps per control step
+        self.sim_integrator_type = "ERK"                # Simulation integrator scheme
+        self.sim_num_stages = 4                         # RK stages per sub-step
         self.time = np.arange(0, self.SimDuration, self.dt)
 
         # --- Reference state (hover at [0, 0.5, 3] with zero velocity) ---
@@ -173,6 +176,11 @@ class SthModel:
              -self.r * sin_a - cos_a],
         ])
 
+        # Pseudo-inverse of the thrust allocation matrix, computed once.
+        # R(x) is orthonormal, so pinv(R @ F) = pinv(F) @ R.T and hovering
+        # inputs reduce to two small matrix products at run time.
+        self.pinv_F = np.linalg.pinv(self.F)
+
         # Net control force (world frame) and torque (body frame)
         fc = R @ (self.F @ u)
         tc = self.M @ u
@@ -191,51 +199,58 @@ class SthModel:
             -params.g * ca.DM([0, 0, 1]) + fc / params.mass,
             ca.solve(params.J, -cross(omega, params.J @ omega) + tc),
         )
+        # Merge duplicated trig subterms (the Euler-angle sines/cosines appear
+        # in both the rotation matrix and Tinv) before codegen
+        f_expl = ca.cse(f_expl)
         self.f_expl_func = ca.Function("f_expl", [x, u], [f_expl])
 
-        # --- Per-obstacle nonlinear constraints ---
+        # --- Per-obstacle nonlinear constraints (SoA layout) ---
+        # Obstacles are grouped by type into stacked coefficient matrices so
+        # one vectorised expression covers each group instead of building a
+        # separate symbolic subtree per obstacle.
         # For spheres: squared distance >= (r + maxRad)²
         # For boxes:   signed distance function (SDF) >= 0
+        sph = [o for o in params.obstacles if o["type"] == "sphere"]
+        boxes = [o for o in params.obstacles if o["type"] == "box"]
+
         h_expr_list = []
         h_min_list = []
         h_max_list = []
 
-        for obs in params.obstacles:
-            if obs["type"] == "sphere":
-                c = obs["center"]
-                r = obs["radius"]
+        if sph:
+            C = ca.DM(np.stack([o["center"] for o in sph]))        # (k, 3)
+            radii = np.array([o["radius"] for o in sph])
 
-                # Squared Euclidean distance from drone centre to sphere centre
-                h = (p[0] - c[0]) ** 2 + (p[1] - c[1]) ** 2 + (p[2] - c[2]) ** 2
-                h_expr_list.append(h)
-                h_min_list.append((r + params.maxRad) ** 2)
-                h_max_list.append(1e10)
+            # Squared Euclidean distances from drone centre to all centres
+            diffs = ca.repmat(p.T, len(sph), 1) - C
+            h_expr_list.append(ca.sum2(diffs * diffs))
+            h_min_list.append((radii + params.maxRad) ** 2)
+            h_max_list.append(np.full(len(sph), 1e10))
 
-            elif obs["type"] == "box":
-                c = obs["center"]
-                d = obs["dimensions"]
-                b = d / 2.0   # Half-dimensions (semi-axes)
+        if boxes:
+            k = len(boxes)
+            C = ca.DM(np.stack([o["center"] for o in boxes]))      # (k, 3)
+            B = ca.DM(np.stack([o["dimensions"] / 2.0 for o in boxes]))
 
-                # Signed distance function (SDF) for an axis-aligned box
-                q = ca.fabs(p - c) - b
+            # Signed distance function (SDF) for axis-aligned boxes
+            q = ca.fabs(ca.repmat(p.T, k, 1) - C) - B
 
-                # Outside component: L2 norm of penetration per axis
-                outside_dist = ca.norm_2(ca.fmax(q, 0))
+            # Outside component: L2 norm of penetration per axis
+            q_out = ca.fmax(q, 0)
+            outside_dist = ca.sqrt(ca.sum2(q_out * q_out))
 
-                # Inside component: depth of the deepest axis inside the box
-                inside_dist = ca.fmin(ca.fmax(q[0], ca.fmax(q[1], q[2])), 0)
+            # Inside component: depth of the deepest axis inside the box
+            inside_dist = ca.fmin(ca.fmax(q[:, 0], ca.fmax(q[:, 1], q[:, 2])), 0)
 
-                # Full SDF: positive outside, negative inside
-                dist = outside_dist + inside_dist
-
-                # Constraint: SDF must exceed the drone safety radius
-                h_expr_list.append(dist - params.maxRad)
-                h_min_list.append(0.0)
-                h_max_list.append(1e10)
+            # Full SDF (positive outside, negative inside) must exceed the
+            # drone safety radius
+            h_expr_list.append(outside_dist + inside_dist - params.maxRad)
+            h_min_list.append(np.zeros(k))
+            h_max_list.append(np.full(k, 1e10))
 
         self.h_expr = vertcat(*h_expr_list)
-        self.h_min = np.array(h_min_list)
-        self.h_max = np.array(h_max_list)
+        self.h_min = np.concatenate(h_min_list) if h_min_list else np.empty(0)
+        self.h_max = np.concatenate(h_max_list) if h_max_list else np.empty(0)
         self.h_func = ca.Function("h_func", [x], [self.h_expr])
 
         # --- Input bounds (normalised rotor speed in [0, 1]) ---
@@ -286,6 +301,7 @@ def initialize_guess(
         Defaults to ``x0`` at every stage.
     """
     N = params.N
+    nx = model.nx
     nu = model.nu
 
     # --- Default guesses ---
@@ -294,13 +310,15 @@ def initialize_guess(
     if x_guess is None:
         x_guess = x0.copy()
 
-    # --- Set interior stages ---
-    for k in range(N):
-        solver.set(k, "u", u_guess if u_guess.ndim == 1 else u_guess[k])
-        solver.set(k, "x", x_guess if x_guess.ndim == 1 else x_guess[k])
+    # --- Broadcast constant guesses to full trajectories ---
+    if u_guess.ndim == 1:
+        u_guess = np.broadcast_to(u_guess, (N, nu))
+    if x_guess.ndim == 1:
+        x_guess = np.broadcast_to(x_guess, (N + 1, nx))
 
-    # --- Set terminal stage ---
-    solver.set(N, "x", x_guess if x_guess.ndim == 1 else x_guess[N])
+    # Push each field with one batched call instead of one set() per stage
+    solver.set_flat("u", u_guess.reshape(-1))
+    solver.set_flat("x", x_guess.reshape(-1))
 
 
 # =============================================================================
@@ -329,7 +347,14 @@ def create_acados_sim(
     sim.model = model.amodel
     sim.dims.nx = model.nx
     sim.dims.nu = model.nu
-    sim.solver_options.T = params.dtSim
+    # Integrate a full control step per solve, with the dtSim sub-stepping
+    # handled inside the compiled integrator instead of a Python loop
+    sim.solver_options.T = params.dt
+    sim.solver_options.num_steps = params.nsub
+    # Integrator scheme and stage count are configurable so stiffer models
+    # can switch to IRK or adjust the RK order without touching this code
+    sim.solver_options.integrator_type = params.sim_integrator_type
+    sim.solver_options.num_stages = params.sim_num_stages
     return AcadosSimSolver(sim, json_file="acados_sim.json")
 
 
@@ -362,16 +387,18 @@ def rollback_guess(
     """
     N = params.N
 
-    # Retrieve the full solution trajectory
-    x_sol = np.array([solver.get(k, "x") for k in range(N + 1)])
-    u_sol = np.array([solver.get(k, "u") for k in range(N)])
+    # Retrieve the full solution trajectory in two batched calls instead of
+    # one Python/C round trip per stage
+    x_sol = solver.get_flat("x").reshape(N + 1, model.nx)
+    u_sol = solver.get_flat("u").reshape(N, model.nu)
 
-    # Shift by one step, repeating the terminal stage
-    x_guess = np.vstack([x_sol[1:], x_sol[-1]])
-    u_guess = np.vstack([u_sol[1:], u_sol[-1]])
+    # Shift by one step in place (the arrays are freshly fetched, so nothing
+    # else aliases them); the terminal stage is repeated automatically
+    x_sol[:-1] = x_sol[1:]
+    u_sol[:-1] = u_sol[1:]
 
     initialize_guess(solver, model, params, x_current,
-                     u_guess=u_guess, x_guess=x_guess)
+                     u_guess=u_sol, x_guess=x_sol)
 
 
 # =============================================================================
@@ -382,32 +409,94 @@ def dynamicsSim(
     sim_solver: AcadosSimSolver,
     x: np.ndarray,
     u: np.ndarray,
-    nsub: int,
 ) -> np.ndarray:
-    """Integrate the system dynamics over ``nsub`` sub-steps.
+    """Integrate the system dynamics over one control step.
+
+    The ``dtSim`` sub-stepping is performed inside the acados integrator
+    (``num_steps``), so a single set/solve/get round trip covers the whole
+    control interval.
 
     Parameters
     ----------
     sim_solver : AcadosSimSolver
-        Acados simulation solver performing one integration step at a time.
+        Acados simulation solver integrating one control step per solve.
     x : np.ndarray
         Current state, shape (nx,).
     u : np.ndarray
         Control input held constant during integration, shape (nu,).
-    nsub : int
-        Number of integration sub-steps to perform.
 
     Returns
     -------
     x : np.ndarray
-        Updated state after all sub-steps, shape (nx,).
+        Updated state after the control step, shape (nx,).
+    """
+    # simulate() wraps set/solve/get in one call, cutting the number of
+    # Python-to-C crossings per step from four to one
+    return sim_solver.simulate(x, u)
+
+
+# =============================================================================
+# SOLVER BUILD
+# =============================================================================
+
+def build_ocp_solver(
+    ocp: AcadosOcp,
+    params: Params,
+    json_file: str = "acados_ocp.json",
+) -> AcadosOcpSolver:
+    """Create the OCP solver, regenerating C code only when the config changed.
+
+    acados code generation and compilation dominate start-up time.  A hash
+    of every parameter that influences the generated code is stored next to
+    the solver JSON; when it matches on the next run, the previously
+    compiled solver library is reloaded instead of rebuilt.
+
+    Parameters
+    ----------
+    ocp : AcadosOcp
+        Fully configured OCP description.
+    params : Params
+        Configuration object; all codegen-relevant fields are hashed.
+    json_file : str
+        Path of the solver JSON file.  The hash is stored alongside it.
+
+    Returns
+    -------
+    AcadosOcpSolver
+        A freshly built or reloaded solver instance.
     """
-    for _ in range(nsub):
-        sim_solver.set("x", x)
-        sim_solver.set("u", u)
-        sim_solver.solve()
-        x = sim_solver.get("x")
-    return x
+    cfg = (
+        params.N, params.dt, params.mass, params.J.tolist(),
+        params.l, params.cf, params.ct,
+        params.u_bar, params.alpha_tilt, params.maxRad,
+        params.Q.tolist(), params.R.tolist(),
+        params.x_ref.tolist(), params.use_u_ref_hovering,
+        params.state_constraint_active,
+        params.xlim, params.ylim, params.zlim,
+        [
+            (o["type"], o["center"].tolist(),
+             np.asarray(o.get("dimensions", o.get("radius"))).tolist())
+            for o in params.obstacles
+        ],
+        ocp.solver_options.ext_fun_compile_flags,
+    )
+    cfg_hash = hashlib.sha1(repr(cfg).encode()).hexdigest()
+    hash_file = json_file.replace(".json", ".hash")
+
+    reuse = False
+    if os.path.exists(hash_file) and os.path.exists(json_file):
+        with open(hash_file) as f:
+            reuse = f.read().strip() == cfg_hash
+
+    if reuse:
+        return AcadosOcpSolver(
+            ocp, json_file=json_file, build=False, generate=False
+        )
+
+    solver = AcadosOcpSolver(ocp, json_file=json_file)
+    with open(hash_file, "w") as f:
+        f.write(cfg_hash)
+    return solver
 
 
 # =============================================================================
@@ -466,8 +555,8 @@ def run_mpc(
     # Compute hovering reference input via pseudo-inverse of the thrust matrix
     x_ref = params.x_ref
     if params.use_u_ref_hovering:
-        u_ref = (
-            np.linalg.pinv(model.R(x_ref).full() @ model.F)
+        u_ref = model.pinv_F @ (
+            model.R(x_ref).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
     else:
@@ -525,33 +614,50 @@ def run_mpc(
     ocp.solver_options.nlp_solver_type = "SQP"
     ocp.solver_options.nlp_solver_max_iter = 500
 
-    # --- Compile solvers ---
-    solver = AcadosOcpSolver(ocp, json_file="acados_ocp.json")
+    # Compile the generated dynamics/constraint functions with full
+    # optimisation; they are evaluated at every SQP iteration and stage
+    ocp.solver_options.ext_fun_compile_flags = "-O3 -march=native"
+
+    # --- Compile solvers (skipping codegen when the config is unchanged) ---
+    solver = build_ocp_solver(ocp, params, json_file="acados_ocp.json")
     sim_solver = create_acados_sim(model, params)
 
     # --- Initialise simulation state and warm-start ---
+    # Trajectory storage is preallocated: the number of steps is known, so
+    # there is no need for per-step list appends and a final conversion
+    n_steps = params.time.shape[0]
     x = np.zeros(nx)
-    xg = [x.copy()]
-    ug = []
+    xg = np.empty((n_steps + 1, nx))
+    ug = np.empty((n_steps, nu))
+    xg[0] = x
 
     u_prev = (
-        np.linalg.pinv(model.R(x).full() @ model.F)
-        @ np.array([0, 0, params.mass * params.g])
+        model.pinv_F
+        @ (model.R(x).full().T @ np.array([0, 0, params.mass * params.g]))
         / params.u_bar
     )
 
     initialize_guess(solver, model, params, x, u_guess=u_prev, x_guess=x)
 
     # --- MPC loop ---
-    for ist in tqdm(range(params.time.shape[0]), desc="MPC Simulation Progress"):
+    u = u_prev.copy()
+    for ist in tqdm(range(n_steps), desc="MPC Simulation Progress"):
         solver.solve_for_x0(x, False, False)
-        u = solver.get(0, "u")
+        status = solver.get_status()
+
+        if status == 0:
+            u = solver.get(0, "u")
+        else:
+            # Keep applying the previous input rather than reading back an
+            # unconverged iterate from the solver
+            print(f"Alert: solver status {status} at t={ist * params.dt:.2f}s, "
+                  "reusing previous input.")
 
-        x = dynamicsSim(sim_solver, x, u, params.nsub)
+        x = dynamicsSim(sim_solver, x, u)
         rollback_guess(solver, model, params, x)
 
-        ug.append(u)
-        xg.append(x.copy())
+        ug[ist] = u
+        xg[ist + 1] = x
 
     # --- Persist trajectory data ---
     traj_path = os.path.join(
@@ -559,7 +665,7 @@ def run_mpc(
     )
     with open(traj_path, "wb") as f:
         pickle.dump(
-            {"xg": np.asarray(xg), "ug": np.asarray(ug)},
+            {"xg": xg, "ug": ug},
             f,
             protocol=pickle.HIGHEST_PROTOCOL,
         )
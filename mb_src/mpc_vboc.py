@@ -1,5 +1,4 @@
 import os
-import copy
 import ctypes
 import pickle
 import time
@@ -7,11 +6,9 @@ import time
 import numpy as np
 import torch
 import torch.nn as nn
-from scipy.optimize import minimize
 from tqdm import tqdm
 import casadi as ca
-from casadi import MX, vertcat, horzcat, sin, cos, tan, cross, fmin, fmax
-import l4casadi as l4c
+from casadi import MX, vertcat, horzcat, sin, cos, tan, cross
 from acados_template import (
     AcadosModel, AcadosOcp, AcadosOcpSolver,
     AcadosSim, AcadosSimSolver,
@@ -213,6 +210,11 @@ class SthModel:
              -self.r * sin_a - cos_a],
         ])
 
+        # Pseudo-inverse of the thrust allocation matrix, computed once.
+        # R(x) is orthonormal, so pinv(R @ F) = pinv(F) @ R.T and hovering
+        # inputs reduce to two small matrix products at run time.
+        self.pinv_F = np.linalg.pinv(self.F)
+
         # Net control force (world frame) and torque (body frame)
         fc = R @ (self.F @ u)
         tc = self.M @ u
@@ -231,6 +233,9 @@ class SthModel:
             -params.g * ca.DM([0, 0, 1]) + fc / params.mass,
             ca.solve(params.J, -cross(omega, params.J @ omega) + tc),
         )
+        # Merge duplicated trig subterms (the Euler-angle sines/cosines appear
+        # in both the rotation matrix and Tinv) before codegen
+        f_expl = ca.cse(f_expl)
         self.f_expl_func = ca.Function("f_expl", [x, u], [f_expl])
 
         # --- Axis-aligned box obstacle-avoidance constraint ---
@@ -246,6 +251,10 @@ class SthModel:
             (box[5] - params.maxRad) - p[2],    # z <= z_max - maxRad
         )
         self.h_func = ca.Function('h_func', [x, box], [h_box])
+        # The raw expression is kept as well: both OCP builders attach it
+        # directly (it is already written on amodel.x / amodel.p), sharing
+        # one symbolic subtree instead of expanding h_func per stage bucket
+        self.h_expr = h_box
         self.h_min = np.zeros(6)
         self.h_max = np.full(6, 1e6)
 
@@ -262,6 +271,32 @@ class SthModel:
         model.p = box
         self.amodel = model
 
+    def clone_amodel(self, name: str) -> AcadosModel:
+        """Return a fresh ``AcadosModel`` sharing this model's symbolics.
+
+        Each OCP needs its own model object (with a unique name) because it
+        attaches its own constraint expressions, but a deep copy would walk
+        the entire MX graph; reusing the symbolic variables and expressions
+        by reference is sufficient and free.
+
+        Parameters
+        ----------
+        name : str
+            Name assigned to the cloned acados model.
+
+        Returns
+        -------
+        AcadosModel
+            New model object referencing the shared symbolic expressions.
+        """
+        amodel = AcadosModel()
+        amodel.name = name
+        amodel.x = self.amodel.x
+        amodel.u = self.amodel.u
+        amodel.f_expl_expr = self.amodel.f_expl_expr
+        amodel.p = self.amodel.p
+        return amodel
+
 
 # =============================================================================
 # INITIAL GUESS
@@ -314,16 +349,23 @@ def initialize_guess(
     if p_guess is None:
         p_guess = np.zeros(model.amodel.p.shape[0])
 
-    # --- Set interior stages ---
-    for k in range(N):
-        solver.set(k, "u", u_guess if u_guess.ndim == 1 else u_guess[k])
-        solver.set(k, "x", x_guess if x_guess.ndim == 1 else x_guess[k])
+    # --- Broadcast constant guesses to full trajectories ---
+    if u_guess.ndim == 1:
+        u_guess = np.broadcast_to(u_guess, (N, nu))
+    if x_guess.ndim == 1:
+        x_guess = np.broadcast_to(x_guess, (N + 1, nx))
 
-    # --- Set terminal stage ---
-    solver.set(N, "x", x_guess if x_guess.ndim == 1 else x_guess[N])
+    # Push each field with one batched call instead of one set() per stage
+    solver.set_flat("u", u_guess.reshape(-1))
+    solver.set_flat("x", x_guess.reshape(-1))
 
-    for k in range(N + 1):
-        solver.set(k, "p", p_guess)
+    # Acados retains stage parameters across solves, so the N+1 per-stage
+    # pushes are only needed when the box actually changed since last call
+    last_p = getattr(solver, "_last_p_guess", None)
+    if last_p is None or not np.array_equal(last_p, p_guess):
+        for k in range(N + 1):
+            solver.set(k, "p", p_guess)
+        solver._last_p_guess = p_guess.copy()
 
 
 # =============================================================================
@@ -341,18 +383,22 @@ def create_acados_sim(
     model : SthModel
         Robot model whose ``amodel`` is passed to the simulator.
     params : Params
-        Configuration object providing the integration time step ``dtSim``.
+        Configuration object providing the control step ``dt`` and the
+        number of integration sub-steps ``nsub``.
 
     Returns
     -------
     sim_solver : AcadosSimSolver
-        Compiled acados simulation solver ready to integrate one step.
+        Compiled acados simulation solver ready to integrate one control step.
     """
     sim = AcadosSim()
     sim.model = model.amodel
     sim.dims.nx = model.nx
     sim.dims.nu = model.nu
-    sim.solver_options.T = params.dtSim
+    # Integrate a full control step per solve, with the dtSim sub-stepping
+    # handled inside the compiled integrator instead of a Python loop
+    sim.solver_options.T = params.dt
+    sim.solver_options.num_steps = params.nsub
     sim.parameter_values = np.zeros(6)
     return AcadosSimSolver(sim, json_file="acados_sim.json")
 
@@ -389,9 +435,10 @@ def rollback_guess(
     """
     N = params.N
 
-    # Retrieve the full solution trajectory
-    x_sol = np.array([solver.get(k, "x") for k in range(N + 1)])
-    u_sol = np.array([solver.get(k, "u") for k in range(N)])
+    # Retrieve the full solution trajectory in one call; the reshape is a
+    # zero-copy view of the flat buffer
+    x_sol = solver.get_flat("x").reshape(N + 1, model.nx)
+    u_sol = solver.get_flat("u").reshape(N, model.nu)
 
     # Shift by one step, repeating the terminal stage
     x_guess = np.vstack([x_sol[1:], x_sol[-1]])
@@ -413,32 +460,30 @@ def dynamicsSim(
     sim_solver: AcadosSimSolver,
     x: np.ndarray,
     u: np.ndarray,
-    nsub: int,
 ) -> np.ndarray:
-    """Integrate the system dynamics over ``nsub`` sub-steps.
+    """Integrate the system dynamics over one control step.
+
+    The sub-stepping is performed inside the compiled acados integrator
+    (``num_steps`` in :func:`create_acados_sim`), so a single set/solve/get
+    round-trip advances the state by a full control period.
 
     Parameters
     ----------
     sim_solver : AcadosSimSolver
-        Acados simulation solver performing one integration step at a time.
+        Acados simulation solver integrating one control step per solve.
     x : np.ndarray
         Current state, shape (nx,).
     u : np.ndarray
         Control input to hold constant during integration, shape (nu,).
-    nsub : int
-        Number of integration sub-steps to perform.
 
     Returns
     -------
     x : np.ndarray
-        Updated state after all sub-steps, shape (nx,).
+        Updated state after one control step, shape (nx,).
     """
-    for _ in range(nsub):
-        sim_solver.set("x", x)
-        sim_solver.set("u", u)
-        sim_solver.solve()
-        x = sim_solver.get("x")
-    return x
+    # simulate() wraps set/solve/get in one call, cutting the number of
+    # Python-to-C crossings per step from four to one
+    return sim_solver.simulate(x, u)
 
 
 # =============================================================================
@@ -475,10 +520,9 @@ def define_ocp(
     ny_e = nx         # Terminal output dimension
 
     ocp = AcadosOcp()
-    ocp.model = copy.deepcopy(model.amodel)
+    ocp.model = model.clone_amodel(params.robot_name + "_tracking")
     ocp.dims.N = params.N
     ocp.solver_options.tf = params.N * params.dt
-    ocp.model.name = params.robot_name + "_tracking"
 
     # --- Cost: linear least-squares on [x; u] deviations ---
     ocp.cost.cost_type = "LINEAR_LS"
@@ -504,8 +548,8 @@ def define_ocp(
     # Compute hovering reference input via pseudo-inverse of the thrust matrix
     x_ref = params.x_ref
     if params.use_u_ref_hovering:
-        u_ref = (
-            np.linalg.pinv(model.R(x_ref).full() @ model.F)
+        u_ref = model.pinv_F @ (
+            model.R(x_ref).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
     else:
@@ -525,8 +569,9 @@ def define_ocp(
     # Initial state fixed to x0 (set at solve time)
     ocp.constraints.x0 = np.zeros(nx)
 
-    # Obstacle constraint at initial, path, and terminal stages
-    h_expr = model.h_func(model.amodel.x, model.amodel.p)
+    # Obstacle constraint at initial, path, and terminal stages; the shared
+    # expression built once in SthModel is reused by all three buckets
+    h_expr = model.h_expr
 
     ocp.model.con_h_expr_0 = h_expr
     ocp.constraints.lh_0 = model.h_min
@@ -538,8 +583,11 @@ def define_ocp(
 
     nn_expr = safe_set.nn_func(model.amodel.x, model.amodel.p)
     ocp.model.con_h_expr_e = vertcat(h_expr, nn_expr)
-    ocp.constraints.lh_e = np.zeros((7, 1))
-    ocp.constraints.uh_e = np.full((7, 1), 1e6)
+    # Size the terminal bounds from the stacked expression instead of a
+    # hardcoded count, so added obstacle rows propagate automatically
+    nh_e = h_expr.shape[0] + nn_expr.shape[0]
+    ocp.constraints.lh_e = np.zeros(nh_e)
+    ocp.constraints.uh_e = np.full(nh_e, 1e6)
 
     # --- Solver options ---
     ocp.solver_options.integrator_type = "ERK"
@@ -587,10 +635,9 @@ def define_ocpSafeAbort(
     ny = nv + nu        # Stage output: velocities + inputs
 
     ocp = AcadosOcp()
-    ocp.model = copy.deepcopy(model.amodel)
+    ocp.model = model.clone_amodel(params.robot_name + "_safe_abort")
     ocp.dims.N = params.Nvboc
     ocp.solver_options.tf = params.Nvboc * params.dt
-    ocp.model.name = params.robot_name + "_safe_abort"
 
     ocp.cost.cost_type = "LINEAR_LS"
     ocp.cost.cost_type_e = "LINEAR_LS"
@@ -619,8 +666,8 @@ def define_ocpSafeAbort(
 
     # Compute hovering reference input
     if params.use_u_ref_hovering:
-        u_hover = (
-            np.linalg.pinv(model.R(np.zeros(nx)).full() @ model.F)
+        u_hover = model.pinv_F @ (
+            model.R(np.zeros(nx)).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
     else:
@@ -641,8 +688,9 @@ def define_ocpSafeAbort(
 
     ocp.constraints.x0 = np.zeros(nx)
 
-    # Obstacle constraint at initial, path, and terminal stages
-    h_expr = model.h_func(model.amodel.x, model.amodel.p)
+    # Obstacle constraint at initial, path, and terminal stages; the shared
+    # expression built once in SthModel is reused by all three buckets
+    h_expr = model.h_expr
 
     ocp.model.con_h_expr_0 = h_expr
     ocp.constraints.lh_0 = model.h_min
@@ -688,6 +736,10 @@ class NeuralNetwork(nn.Module):
         Defaults to ``nn.ReLU()``.
     ub : float or None, optional
         Output upper-bound scaling factor.  Defaults to 1.
+    mean, std : torch.Tensor or None, optional
+        Per-input standardisation statistics.  When given, they are folded
+        into a frozen affine layer in front of the stack, so callers feed
+        raw inputs and no external normalisation ops are needed.
     """
 
     def __init__(
@@ -698,8 +750,19 @@ class NeuralNetwork(nn.Module):
         number_hidden: int,
         activation: nn.Module = nn.ReLU(),
         ub: float | None = None,
+        mean: torch.Tensor | None = None,
+        std: torch.Tensor | None = None,
     ) -> None:
         super().__init__()
+
+        if mean is not None and std is not None:
+            norm = nn.Linear(input_size, input_size)
+            norm.weight = nn.Parameter(torch.diag(1.0 / std), requires_grad=False)
+            norm.bias = nn.Parameter(-mean / std, requires_grad=False)
+            self.normalize: nn.Module | None = norm
+        else:
+            self.normalize = None
+
         layers = []
 
         # Input layer
@@ -732,6 +795,8 @@ class NeuralNetwork(nn.Module):
         out : torch.Tensor
             Scaled network output, shape (batch, output_size).
         """
+        if self.normalize is not None:
+            x = self.normalize(x)
         return self.linear_stack(x) * self.ub
 
     def initialize_weights(self) -> None:
@@ -754,7 +819,9 @@ class NetSafeSet:
     ``nn_func`` for use inside acados OCP terminal constraints.
 
     The input to the network is:
-        [box (standardised), orientation (standardised), velocity direction]
+        [box, orientation, velocity direction]
+    with the training standardisation of the box and orientation entries
+    folded into a frozen layer inside the network.
 
     Parameters
     ----------
@@ -766,6 +833,10 @@ class NetSafeSet:
     """
 
     def __init__(self, model: object, params: object) -> None:
+        # Deferred import: l4casadi pulls in its full build tool-chain at
+        # import time, which only NN-constrained runs need to pay for
+        import l4casadi as l4c
+
         self.constraints = []
         self.constraints_fun = []
         self.bounds = []
@@ -774,12 +845,35 @@ class NetSafeSet:
         nori = 3
 
         # --- Load network weights ---
-        nn_data = torch.load(params.net_path, weights_only=False)
+        # The network is only embedded into a CasADi graph here; keep it on
+        # the CPU so no GPU (or CUDA context init) is needed for codegen.
+        nn_data = torch.load(
+            params.net_path, weights_only=False, map_location='cpu'
+        )
+
+        # Fold the input standardisation into a frozen affine layer inside
+        # the network (identity on the velocity-direction entries), so the
+        # CasADi graph around the l4casadi call stays minimal
+        n_norm = 6 + nori   # standardised entries: box + orientation
+        in_mean = torch.zeros(params.input_size)
+        in_std = torch.ones(params.input_size)
+        in_mean[:n_norm] = float(nn_data['mean'])
+        in_std[:n_norm] = float(nn_data['std'])
+
         model_net = NeuralNetwork(
             params.input_size, params.hidden_size, params.output_size,
             params.number_hidden, params.act_fun, ub=1,
-        ).to(params.device)
-        model_net.load_state_dict(nn_data['model'])
+            mean=in_mean, std=in_std,
+        )
+        # strict=False: the checkpoint predates the frozen normalisation layer
+        model_net.load_state_dict(nn_data['model'], strict=False)
+        # Inference only: disable dropout/batch-norm training behaviour and
+        # gradient tracking before tracing the network with l4casadi.
+        model_net.eval()
+        model_net.requires_grad_(False)
+        # Single-threaded torch for the trace/codegen phase: the MLP is tiny
+        # and intra-op thread spawn overhead dominates any parallel gain.
+        torch.set_num_threads(1)
 
         x_cp = model.amodel.x
         p_cp = model.amodel.p
@@ -803,25 +897,26 @@ class NetSafeSet:
         box_in_robot_frame[:3] = -ca.fmax(box_lower, room_lower)
         box_in_robot_frame[3:] =  ca.fmin(box_upper, room_upper)
 
-        # Standardise box and orientation using training statistics
-        box = (box_in_robot_frame - nn_data['mean']) / nn_data['std']
-        orient = (x_cp[npos:npos + nori] - nn_data['mean']) / nn_data['std']
-
         # Compute unit velocity direction (smoothed norm to avoid division by zero)
-        vel_norm = ca.sqrt(
-            ca.dot(x_cp[npos + nori:], x_cp[npos + nori:]) + params.eps ** 2
-        )
+        # sumsqr references the velocity slice once, unlike dot(v, v) which
+        # duplicates the slice subtree as both of its arguments
+        vel_norm = ca.sqrt(ca.sumsqr(x_cp[npos + nori:]) + params.eps ** 2)
         vel_dir = x_cp[npos + nori:] / vel_norm
 
-        # Assemble network input: [box, orientation, velocity direction]
-        state = ca.vertcat(box, orient, vel_dir)
+        # Assemble raw network input: [box, orientation, velocity direction];
+        # the standardisation happens inside the network itself
+        state = ca.vertcat(box_in_robot_frame, x_cp[npos:npos + nori], vel_dir)
 
         # Wrap PyTorch model with l4casadi for CasADi compatibility
         self.l4c_model = l4c.L4CasADi(
             model_net,
-            device=params.device,
+            device='cpu',
             name=f'{params.robot_name}_model',
             build_dir=params.build_dir,
+            # The OCP uses a Gauss-Newton Hessian, so the second-order
+            # derivatives of the network are never evaluated; skipping
+            # their generation roughly halves the l4casadi codegen time
+            generate_jac_jac=False,
         )
 
         # NN constraint: output scaled by (1 - alpha/100) must exceed vel_norm
@@ -831,6 +926,12 @@ class NetSafeSet:
         )
 
 
+# Cache of traced safe-set networks: building one involves a torch checkpoint
+# load plus l4casadi code generation, neither of which depends on anything
+# other than the checkpoint path and the confidence level
+_safe_set_cache: dict[tuple, NetSafeSet] = {}
+
+
 # =============================================================================
 # BOX SELECTION
 # =============================================================================
@@ -1167,8 +1268,12 @@ def run_mpc(
     params : Params
         Configuration object providing all simulation settings.
     """
-    # --- Build neural-network safe set ---
-    safe_set = NetSafeSet(model, params)
+    # --- Build neural-network safe set (cached across calls) ---
+    safe_set_key = (params.net_path, params.alpha)
+    safe_set = _safe_set_cache.get(safe_set_key)
+    if safe_set is None:
+        safe_set = NetSafeSet(model, params)
+        _safe_set_cache[safe_set_key] = safe_set
 
     # --- Discretise obstacles into sphere point clouds ---
     obsCenters = []
@@ -1212,6 +1317,11 @@ def run_mpc(
 
     xg_all, ug_all, bg_all = [], [], []
 
+    # Preallocated scratch reused across iterations: the gravity wrench is
+    # constant and the free-space box is overwritten in place each step
+    gravity_force = np.array([0.0, 0.0, params.mass * params.g])
+    box = np.empty(6)
+
     for x0 in x0_list:
         x = x0.copy()
         xg = [x.copy()]
@@ -1219,10 +1329,7 @@ def run_mpc(
         bg = []
 
         x_prev = np.full((params.N + 1, model.nx), x)
-        u0 = (
-            np.linalg.pinv(model.R(x).full() @ model.F)
-            @ np.array([0, 0, params.mass * params.g])
-        )
+        u0 = model.pinv_F @ (model.R(x).full().T @ gravity_force)
         u_prev = np.full((params.N, model.nu), u0)
 
         # Compute initial free-space box
@@ -1231,17 +1338,17 @@ def run_mpc(
             x_min, x_max, y_min, y_max, z_min, z_max, _, _ = min_cube_select(
                 discObsPoints, obsRadii, drone_radius=params.maxRad
             )
-            box = np.array([
+            box[:] = (
                 x_min + x[0], x_max + x[0],
                 y_min + x[1], y_max + x[1],
                 z_min + x[2], z_max + x[2],
-            ])
+            )
         else:
-            box = np.array([
+            box[:] = (
                 params.xlim[0], params.xlim[1],
                 params.ylim[0], params.ylim[1],
                 params.zlim[0], params.zlim[1],
-            ])
+            )
 
         initialize_guess(
             solver, params.N, model, params, x,
@@ -1265,24 +1372,24 @@ def run_mpc(
             tmin = min(tmin, t1)
             ttot += t1
 
-            x_sol = np.array([solver.get(k, "x") for k in range(params.N + 1)])
-            u_sol = np.array([solver.get(k, "u") for k in range(params.N)])
+            x_sol = solver.get_flat("x").reshape(params.N + 1, model.nx)
+            u_sol = solver.get_flat("u").reshape(params.N, model.nu)
             feas = solver.get_status()
 
             if feas == 0:
                 # Nominal: apply first optimal input and roll back guess
+                # (x_sol/u_sol are freshly built each step, no copy needed)
                 fails = 0
                 u_to_apply = u_sol[0]
-                x_prev = x_sol.copy()
-                u_prev = u_sol.copy()
+                x_prev = x_sol
+                u_prev = u_sol
             else:
                 if fails == 0:
                     # First failure: pre-compute safe-abort trajectory
                     print("Alert: MPC infeasibility detected.")
                     x_safe_start = x_prev[params.N, :]
-                    u_hover = (
-                        np.linalg.pinv(model.R(x_safe_start).full() @ model.F)
-                        @ np.array([0, 0, params.mass * params.g])
+                    u_hover = model.pinv_F @ (
+                        model.R(x_safe_start).full().T @ gravity_force
                     )
                     x_guess_abort = np.tile(x_safe_start, (params.Nvboc + 1, 1))
                     u_guess_abort = np.tile(u_hover, (params.Nvboc, 1))
@@ -1295,9 +1402,9 @@ def run_mpc(
                         p_guess=box,
                     )
                     solverSafeAbort.solve_for_x0(x_safe_start, False, False)
-                    u_safe_abort = np.array([
-                        solverSafeAbort.get(k, "u") for k in range(params.Nvboc)
-                    ])
+                    u_safe_abort = solverSafeAbort.get_flat("u").reshape(
+                        params.Nvboc, model.nu
+                    )
 
                 if fails == params.N:
                     # Too many consecutive failures: switch to safe abort
@@ -1309,7 +1416,7 @@ def run_mpc(
                 u_to_apply = u_prev[fails]
                 fails += 1
 
-            x_next = dynamicsSim(sim_solver, x, u_to_apply, params.nsub)
+            x_next = dynamicsSim(sim_solver, x, u_to_apply)
 
             # Update free-space box for the next step
             if len(obsCenters) > 0:
@@ -1318,11 +1425,11 @@ def run_mpc(
                     discObsPoints, obsRadii, drone_radius=params.maxRad
                 )
                 if boxFeasible:
-                    box = np.array([
+                    box[:] = (
                         x_min + x_next[0], x_max + x_next[0],
                         y_min + x_next[1], y_max + x_next[1],
                         z_min + x_next[2], z_max + x_next[2],
-                    ])
+                    )
 
             if feas == 0:
                 rollback_guess(solver, model, params, x_next, p_current=box)
@@ -1335,9 +1442,11 @@ def run_mpc(
                     u_guess=u_shifted, x_guess=x_shifted, p_guess=box,
                 )
 
-            x = x_next.copy()
+            # x_next is a fresh array returned by the integrator every step,
+            # so it can be stored and reused directly
+            x = x_next
             ug.append(u_to_apply)
-            xg.append(x_next.copy())
+            xg.append(x_next)
             bg.append(box.copy())
 
         print(
@@ -1353,10 +1462,10 @@ def run_mpc(
             input("Press Enter to continue...")
 
             for j in range(params.Nvboc):
-                x_next = dynamicsSim(sim_solver, x, u_safe_abort[j], params.nsub)
-                x = x_next.copy()
+                x_next = dynamicsSim(sim_solver, x, u_safe_abort[j])
+                x = x_next
                 ug.append(u_safe_abort[j])
-                xg.append(x_next.copy())
+                xg.append(x_next)
                 bg.append(box.copy())
 
         xg_all.append(np.asarray(xg))
@@ -1,8 +1,12 @@
 import os
-import copy
 import ctypes
+import fcntl
+import hashlib
 import pickle
+import shutil
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Optional
@@ -10,11 +14,9 @@ from typing import Optional
 import numpy as np
 import torch
 import torch.nn as nn
-from scipy.optimize import minimize
 from tqdm import tqdm
 import casadi as ca
-from casadi import MX, vertcat, horzcat, sin, cos, tan, cross, fmin, fmax
-import l4casadi as l4c
+from casadi import MX, vertcat, horzcat, sin, cos, tan, cross
 from acados_template import (
     AcadosModel, AcadosOcp, AcadosOcpSolver,
     AcadosSim, AcadosSimSolver,
@@ -23,6 +25,10 @@ from acados_template import (
 from utils.plotter import plotter
 
 
+# Module directory, resolved once instead of per call site
+_THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
 # =============================================================================
 # PARAMETERS
 # =============================================================================
@@ -67,6 +73,11 @@ class Params:
         self.N = 60                       # Tracking MPC horizon
         self.Nvboc = 20                   # Safe-abort MPC horizon
         self.nlp_solver_max_iter = 100    # Max NLP iterations
+        self.use_cython_solver = False    # Cython solver wrapper: lower
+                                          # per-call overhead than ctypes.
+                                          # Needs an acados build whose Cython
+                                          # wrapper provides set_flat/get_flat,
+                                          # solve_for_x0 and get_status
 
         # --- Simulation parameters ---
         self.SimDuration = 5.0                          # Total simulation time [s]
@@ -89,8 +100,12 @@ class Params:
         # --- MC data gathering ---
         self.mc_mode = True
         self.mc_num = 100   # Number of simulations
+        self.mc_workers = 1  # Parallel worker processes for MC runs (1 = serial)
         self.terminal_const = "none"  # "vboc" / "eq" / "none"
         self.seed = 42
+        # Warm-start the first solve of a run from the previous run's first
+        # feasible solution when the initial boxes are this close (L2 norm).
+        self.warm_start_tau = 0.5
 
 
         # --- Goal-reaching tolerances ---
@@ -159,12 +174,8 @@ class Params:
         self.output_size = 1
         self.number_hidden = 2
         self.act_fun = torch.nn.GELU(approximate='tanh')
-        self.net_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "nn/sth_gelu.pt"
-        )
-        self.build_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "nn"
-        )
+        self.net_path = os.path.join(_THIS_DIR, "nn/sth_gelu.pt")
+        self.build_dir = os.path.join(_THIS_DIR, "nn")
         self.eps = 1e-6    # Smoothing term for velocity norm
         self.alpha = 5     # Safety margin percentage for NN constraint scaling
 
@@ -174,9 +185,7 @@ class Params:
         )
 
         # --- Output directories ---
-        self.plots_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "plots"
-        )
+        self.plots_dir = os.path.join(_THIS_DIR, "plots")
 
 
 # =============================================================================
@@ -280,9 +289,13 @@ def check_goal_reached(
     bool
         True if both position and velocity tolerances are satisfied.
     """
-    pos_error = np.linalg.norm(x[:3] - x_ref[:3])
-    vel_norm = np.linalg.norm(x[6:9])
-    return pos_error <= pos_tol and vel_norm <= vel_tol
+    # Compare squared norms to skip the sqrt; the velocity check
+    # short-circuits when the position check already fails.
+    d_pos = x[:3] - x_ref[:3]
+    if d_pos @ d_pos > pos_tol * pos_tol:
+        return False
+    v = x[6:9]
+    return v @ v <= vel_tol * vel_tol
 
 
 def check_collision(
@@ -316,26 +329,73 @@ def check_collision(
         True if any obstacle is in collision with the drone.
     """
     pos = x[:3]
+    box_lo, box_hi, sph_centers, sph_radii = _collision_soa(obstacles)
 
-    for obs in obstacles:
-        if obs['type'] == 'box':
-            half = obs['dimensions'] / 2.0
-            lo = obs['center'] - half
-            hi = obs['center'] + half
+    if box_lo.size:
+        # Closest points on all boxes to the drone centre, in one broadcast;
+        # comparing squared distances avoids the per-step sqrt
+        d = pos - np.clip(pos, box_lo, box_hi)
+        if np.any(np.einsum('ij,ij->i', d, d) < drone_radius * drone_radius):
+            return True
 
-            # Closest point on the box to the drone centre
-            closest = np.clip(pos, lo, hi)
-            dist = np.linalg.norm(pos - closest)
+    if sph_centers.size:
+        d = pos - sph_centers
+        if np.any(np.einsum('ij,ij->i', d, d) < (drone_radius + sph_radii) ** 2):
+            return True
 
-            if dist < drone_radius:
-                return True
+    return False
 
-        elif obs['type'] == 'sphere':
-            dist = np.linalg.norm(pos - obs['center'])
-            if dist < (drone_radius + obs['radius']):
-                return True
 
-    return False
+# SoA arrays for the last-seen obstacle list: the per-step collision check
+# works on stacked bound/centre matrices instead of a Python loop over dicts,
+# and the arrays are rebuilt only when a new obstacle list is installed
+_collision_soa_cache: tuple = (None, None)
+
+
+def _collision_soa(
+    obstacles: list[dict],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return stacked (box_lo, box_hi, sph_centers, sph_radii) arrays.
+
+    The result is cached against the identity of ``obstacles``, so repeated
+    calls within a run only pay for one tuple lookup.
+
+    Parameters
+    ----------
+    obstacles : list[dict]
+        Obstacle dicts in the same format accepted by ``check_collision``.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Box face bounds of shape (K, 3) each, sphere centres (M, 3), and
+        sphere radii (M,).
+    """
+    global _collision_soa_cache
+    cached_key, soa = _collision_soa_cache
+
+    if cached_key is not obstacles:
+        boxes = [o for o in obstacles if o['type'] == 'box']
+        spheres = [o for o in obstacles if o['type'] == 'sphere']
+
+        if boxes:
+            centers = np.stack([o['center'] for o in boxes])
+            halves = np.stack([o['dimensions'] for o in boxes]) / 2.0
+            box_lo, box_hi = centers - halves, centers + halves
+        else:
+            box_lo = box_hi = np.empty((0, 3))
+
+        if spheres:
+            sph_centers = np.stack([o['center'] for o in spheres])
+            sph_radii = np.array([o['radius'] for o in spheres])
+        else:
+            sph_centers = np.empty((0, 3))
+            sph_radii = np.empty(0)
+
+        soa = (box_lo, box_hi, sph_centers, sph_radii)
+        _collision_soa_cache = (obstacles, soa)
+
+    return soa
 
 # =============================================================================
 # SUPPORT FUNCTIONS  —  obstacle randomisation
@@ -367,44 +427,51 @@ def randomize_obstacles(params: Params, run_id: int) -> list[dict]:
     """
     rng = np.random.default_rng(params.seed + run_id)
 
-    # Room-wide centre fallback (with safety margin from walls)
-    m = params.obs_margin
-    cx_default = (params.xlim[0] + m, params.xlim[1] - m)
-    cy_default = (params.ylim[0] + m, params.ylim[1] - m)
-    cz_default = (params.zlim[0] + m, params.zlim[1] - m)
-
-    n_obs = len(params.obs_bounds)
-    obstacles = []
-
-    for i in range(n_obs):
-        b = params.obs_bounds[i] if i < len(params.obs_bounds) else {}
-
-        # --- Centre sampling ---
-        cx = rng.uniform(*b.get("cx", cx_default))
-        cy = rng.uniform(*b.get("cy", cy_default))
-        cz = rng.uniform(*b.get("cz", cz_default))
-
-        # --- Dimension sampling ---
-        dx = rng.uniform(
-            b.get("dx", (params.obs_dim_min[0], params.obs_dim_max[0]))[0],
-            b.get("dx", (params.obs_dim_min[0], params.obs_dim_max[0]))[1],
-        )
-        dy = rng.uniform(
-            b.get("dy", (params.obs_dim_min[1], params.obs_dim_max[1]))[0],
-            b.get("dy", (params.obs_dim_min[1], params.obs_dim_max[1]))[1],
+    # The [centre, dimension] bound arrays only depend on the configuration,
+    # so they are assembled once and cached on the Params object; subsequent
+    # runs reuse them and only pay for the single vectorised draw below
+    bounds = getattr(params, "_obs_sampling_bounds", None)
+    if bounds is None:
+        # Room-wide centre fallback (with safety margin from walls)
+        m = params.obs_margin
+        defaults = (
+            (params.xlim[0] + m, params.xlim[1] - m),
+            (params.ylim[0] + m, params.ylim[1] - m),
+            (params.zlim[0] + m, params.zlim[1] - m),
+            (params.obs_dim_min[0], params.obs_dim_max[0]),
+            (params.obs_dim_min[1], params.obs_dim_max[1]),
+            (params.obs_dim_min[2], params.obs_dim_max[2]),
         )
-        dz = rng.uniform(
-            b.get("dz", (params.obs_dim_min[2], params.obs_dim_max[2]))[0],
-            b.get("dz", (params.obs_dim_min[2], params.obs_dim_max[2]))[1],
-        )
-
-        obstacles.append({
-            "center":     np.array([cx, cy, cz]),
-            "dimensions": np.array([dx, dy, dz]),
+        keys = ("cx", "cy", "cz", "dx", "dy", "dz")
+
+        n_obs = len(params.obs_bounds)
+        low = np.empty((n_obs, 6))
+        high = np.empty((n_obs, 6))
+
+        for i in range(n_obs):
+            b = params.obs_bounds[i]
+            for j, (key, default) in enumerate(zip(keys, defaults)):
+                low[i, j], high[i, j] = b.get(key, default)
+
+        # Keep the span and a scratch buffer alongside the lower bound so the
+        # per-run draw can be scaled fully in place
+        bounds = (low, high - low, np.empty((n_obs, 6)))
+        params._obs_sampling_bounds = bounds
+
+    low, span, samples = bounds
+    n_obs = low.shape[0]
+    rng.random(out=samples)
+    samples *= span
+    samples += low
+
+    return [
+        {
+            "center":     samples[i, :3].copy(),
+            "dimensions": samples[i, 3:].copy(),
             "type":       "box",
-        })
-
-    return obstacles
+        }
+        for i in range(n_obs)
+    ]
 
 # =============================================================================
 # MODEL
@@ -474,6 +541,9 @@ class SthModel:
             [cos_a,  cos_a,                  cos_a,
              cos_a,  cos_a,                  cos_a],
         ])
+        # R(x) is orthonormal, so pinv(R @ F) = pinv(F) @ R.T; factor the
+        # pseudo-inverse once and hover inputs cost a matmul per call
+        self.pinv_F = np.linalg.pinv(self.F)
 
         # M maps normalised rotor inputs to body-frame torque [3 × nu]
         self.M = params.u_bar * params.ct * np.array([
@@ -515,6 +585,9 @@ class SthModel:
             -params.g * ca.DM([0, 0, 1]) + fc / params.mass,
             ca.solve(params.J, -cross(omega, params.J @ omega) + tc),
         )
+        # Merge duplicated trig subterms (the Euler-angle sines/cosines appear
+        # in both the rotation matrix and Tinv) before codegen
+        f_expl = ca.cse(f_expl)
         self.f_expl_func = ca.Function("f_expl", [x, u], [f_expl])
 
         # --- Axis-aligned box obstacle-avoidance constraint ---
@@ -546,11 +619,44 @@ class SthModel:
         model.p = box
         self.amodel = model
 
+    def clone_amodel(self, name: str) -> AcadosModel:
+        """Return a fresh ``AcadosModel`` sharing this model's symbolics.
+
+        Each OCP needs its own model object (with a unique name) because it
+        attaches its own constraint expressions, but a deep copy would walk
+        the entire MX graph; reusing the symbolic variables and expressions
+        by reference is sufficient and free.
+
+        Parameters
+        ----------
+        name : str
+            Name assigned to the cloned acados model.
+
+        Returns
+        -------
+        AcadosModel
+            New model object referencing the shared symbolic expressions.
+        """
+        amodel = AcadosModel()
+        amodel.name = name
+        amodel.x = self.amodel.x
+        amodel.u = self.amodel.u
+        amodel.f_expl_expr = self.amodel.f_expl_expr
+        amodel.p = self.amodel.p
+        return amodel
+
 
 # =============================================================================
 # INITIAL GUESS
 # =============================================================================
 
+# Last pushed stage-parameter vector per solver, keyed by id().  Kept outside
+# the solver object because the Cython wrapper is a cdef class without an
+# instance __dict__; keys stay valid since solvers live in _solver_cache for
+# the whole process.
+_last_p_guess: dict[int, np.ndarray] = {}
+
+
 def initialize_guess(
     solver: AcadosOcpSolver,
     N: int,
@@ -598,16 +704,23 @@ def initialize_guess(
     if p_guess is None:
         p_guess = np.zeros(model.amodel.p.shape[0])
 
-    # --- Set interior stages ---
-    for k in range(N):
-        solver.set(k, "u", u_guess if u_guess.ndim == 1 else u_guess[k])
-        solver.set(k, "x", x_guess if x_guess.ndim == 1 else x_guess[k])
+    # --- Broadcast constant guesses to full trajectories ---
+    if u_guess.ndim == 1:
+        u_guess = np.broadcast_to(u_guess, (N, nu))
+    if x_guess.ndim == 1:
+        x_guess = np.broadcast_to(x_guess, (N + 1, nx))
 
-    # --- Set terminal stage ---
-    solver.set(N, "x", x_guess if x_guess.ndim == 1 else x_guess[N])
+    # Push each field with one batched call instead of one set() per stage
+    solver.set_flat("u", u_guess.reshape(-1))
+    solver.set_flat("x", x_guess.reshape(-1))
 
-    for k in range(N + 1):
-        solver.set(k, "p", p_guess)
+    # Acados retains stage parameters across solves, so the N+1 per-stage
+    # pushes are only needed when the box actually changed since last call
+    last_p = _last_p_guess.get(id(solver))
+    if last_p is None or not np.array_equal(last_p, p_guess):
+        for k in range(N + 1):
+            solver.set(k, "p", p_guess)
+        _last_p_guess[id(solver)] = p_guess.copy()
 
 
 # =============================================================================
@@ -625,7 +738,8 @@ def create_acados_sim(
     model : SthModel
         Robot model whose ``amodel`` is passed to the simulator.
     params : Params
-        Configuration object providing the integration time step ``dtSim``.
+        Configuration object providing the control step ``dt`` and the
+        number of integration sub-steps ``nsub``.
 
     Returns
     -------
@@ -636,9 +750,41 @@ def create_acados_sim(
     sim.model = model.amodel
     sim.dims.nx = model.nx
     sim.dims.nu = model.nu
-    sim.solver_options.T = params.dtSim
+    # Integrate a full control step per solve, with the dtSim sub-stepping
+    # handled inside the compiled integrator instead of a Python loop
+    sim.solver_options.T = params.dt
+    sim.solver_options.num_steps = params.nsub
     sim.parameter_values = np.zeros(6)
-    return AcadosSimSolver(sim, json_file="acados_sim.json")
+
+    # Same config-hash gating as build_ocp_solver: when the integrator code
+    # was already generated for this configuration (e.g. by the MC parent's
+    # prebuild), reload the compiled library instead of re-rendering and
+    # recompiling it — essential for pool workers, whose codegen directory
+    # is shared with the parent.  The physical parameters are baked into
+    # the generated dynamics, so they must be part of the hash
+    cfg = (
+        params.robot_name, params.dt, params.nsub,
+        params.mass, params.J.tolist(), params.l, params.cf, params.ct,
+        params.u_bar, params.alpha_tilt,
+    )
+    cfg_hash = hashlib.sha1(repr(cfg).encode()).hexdigest()
+    json_file = "acados_sim.json"
+    hash_file = "acados_sim.hash"
+
+    reuse = False
+    if os.path.exists(hash_file) and os.path.exists(json_file):
+        with open(hash_file) as f:
+            reuse = f.read().strip() == cfg_hash
+
+    if reuse:
+        return AcadosSimSolver(
+            sim, json_file=json_file, build=False, generate=False
+        )
+
+    sim_solver = AcadosSimSolver(sim, json_file=json_file)
+    with open(hash_file, "w") as f:
+        f.write(cfg_hash)
+    return sim_solver
 
 
 # =============================================================================
@@ -673,18 +819,19 @@ def rollback_guess(
     """
     N = params.N
 
-    # Retrieve the full solution trajectory
-    x_sol = np.array([solver.get(k, "x") for k in range(N + 1)])
-    u_sol = np.array([solver.get(k, "u") for k in range(N)])
+    # Retrieve the full solution trajectory with one bulk query per field
+    x_sol = solver.get_flat("x").reshape(N + 1, model.nx)
+    u_sol = solver.get_flat("u").reshape(N, model.nu)
 
-    # Shift by one step, repeating the terminal stage
-    x_guess = np.vstack([x_sol[1:], x_sol[-1]])
-    u_guess = np.vstack([u_sol[1:], u_sol[-1]])
+    # Shift by one step in place (the untouched final row repeats the
+    # terminal stage) instead of allocating two stacked copies
+    x_sol[:-1] = x_sol[1:]
+    u_sol[:-1] = u_sol[1:]
 
     initialize_guess(
         solver, params.N, model, params, x_current,
-        u_guess=u_guess,
-        x_guess=x_guess,
+        u_guess=u_sol,
+        x_guess=x_sol,
         p_guess=p_current,
     )
 
@@ -697,32 +844,30 @@ def dynamicsSim(
     sim_solver: AcadosSimSolver,
     x: np.ndarray,
     u: np.ndarray,
-    nsub: int,
 ) -> np.ndarray:
-    """Integrate the system dynamics over ``nsub`` sub-steps.
+    """Integrate the system dynamics over one control step.
+
+    The sub-stepping is performed inside the compiled acados integrator
+    (``num_steps`` in :func:`create_acados_sim`), so one fused call
+    advances the state by a full control period.
 
     Parameters
     ----------
     sim_solver : AcadosSimSolver
-        Acados simulation solver performing one integration step at a time.
+        Acados simulation solver integrating one control step per solve.
     x : np.ndarray
         Current state, shape (nx,).
     u : np.ndarray
         Control input to hold constant during integration, shape (nu,).
-    nsub : int
-        Number of integration sub-steps to perform.
 
     Returns
     -------
     x : np.ndarray
-        Updated state after all sub-steps, shape (nx,).
+        Updated state after one control step, shape (nx,).
     """
-    for _ in range(nsub):
-        sim_solver.set("x", x)
-        sim_solver.set("u", u)
-        sim_solver.solve()
-        x = sim_solver.get("x")
-    return x
+    # simulate() wraps set/solve/get in a single call, cutting the
+    # Python-to-C crossings per step from four to one
+    return sim_solver.simulate(x, u)
 
 
 # =============================================================================
@@ -746,8 +891,9 @@ def define_ocp(
         Robot model providing dynamics, constraints, and dimensions.
     params : Params
         Configuration object providing cost weights, horizon, and references.
-    safe_set : NetSafeSet
+    safe_set : NetSafeSet or None
         Object exposing ``nn_func`` — a CasADi function for the NN constraint.
+        Required when ``params.terminal_const == "vboc"``; unused otherwise.
 
     Returns
     -------
@@ -759,10 +905,9 @@ def define_ocp(
     ny_e = nx         # Terminal output dimension
 
     ocp = AcadosOcp()
-    ocp.model = copy.deepcopy(model.amodel)
+    ocp.model = model.clone_amodel(params.robot_name + "_tracking")
     ocp.dims.N = params.N
     ocp.solver_options.tf = params.N * params.dt
-    ocp.model.name = params.robot_name + "_tracking"
 
     # --- Cost: linear least-squares on [x; u] deviations ---
     ocp.cost.cost_type = "LINEAR_LS"
@@ -788,8 +933,8 @@ def define_ocp(
     # Compute hovering reference input via pseudo-inverse of the thrust matrix
     x_ref = params.x_ref
     if params.use_u_ref_hovering:
-        u_ref = (
-            np.linalg.pinv(model.R(x_ref).full() @ model.F)
+        u_ref = model.pinv_F @ (
+            model.R(x_ref).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
     else:
@@ -824,8 +969,11 @@ def define_ocp(
         case "vboc":
             nn_expr = safe_set.nn_func(model.amodel.x, model.amodel.p)
             ocp.model.con_h_expr_e = vertcat(h_expr, nn_expr)
-            ocp.constraints.lh_e = np.zeros((7, 1))
-            ocp.constraints.uh_e = np.full((7, 1), 1e6)
+            # Extend the stage bounds with the NN rows in one concatenation
+            # rather than hardcoding the stacked size
+            nn_rows = nn_expr.shape[0]
+            ocp.constraints.lh_e = np.concatenate((model.h_min, np.zeros(nn_rows)))
+            ocp.constraints.uh_e = np.concatenate((model.h_max, np.full(nn_rows, 1e6)))
         case "eq":
             ocp.model.con_h_expr_e = h_expr
             ocp.constraints.lh_e = model.h_min
@@ -846,14 +994,20 @@ def define_ocp(
     ocp.solver_options.qp_solver = "PARTIAL_CONDENSING_HPIPM"
     ocp.solver_options.nlp_solver_type = "SQP"
     ocp.solver_options.nlp_solver_max_iter = params.nlp_solver_max_iter
-
-    # Link the l4casadi shared library so acados can resolve the model symbol
-    lib_name = f'{params.robot_name}_model'
-    ocp.solver_options.custom_templates = []
-    ocp.solver_options.ext_fun_compile_flags = f'-I{params.build_dir}'
-    ocp.solver_options.link_libs = (
-        f'-L{params.build_dir} -l{lib_name} -Wl,-rpath,{params.build_dir}'
-    )
+    # Seed HPIPM from the previous QP solution (primal + dual): consecutive
+    # MPC steps solve nearly identical QPs, so this cuts IPM iterations
+    ocp.solver_options.qp_solver_warm_start = 2
+
+    # Link the l4casadi shared library so acados can resolve the model
+    # symbol; only the vboc terminal mode embeds the network, and only then
+    # is the library guaranteed to have been built
+    if params.terminal_const == "vboc":
+        lib_name = f'{params.robot_name}_model'
+        ocp.solver_options.custom_templates = []
+        ocp.solver_options.ext_fun_compile_flags = f'-I{params.build_dir}'
+        ocp.solver_options.link_libs = (
+            f'-L{params.build_dir} -l{lib_name} -Wl,-rpath,{params.build_dir}'
+        )
 
     return ocp
 
@@ -886,10 +1040,9 @@ def define_ocpSafeAbort(
     ny = nv + nu        # Stage output: velocities + inputs
 
     ocp = AcadosOcp()
-    ocp.model = copy.deepcopy(model.amodel)
+    ocp.model = model.clone_amodel(params.robot_name + "_safe_abort")
     ocp.dims.N = params.Nvboc
     ocp.solver_options.tf = params.Nvboc * params.dt
-    ocp.model.name = params.robot_name + "_safe_abort"
 
     ocp.cost.cost_type = "LINEAR_LS"
     ocp.cost.cost_type_e = "LINEAR_LS"
@@ -918,8 +1071,8 @@ def define_ocpSafeAbort(
 
     # Compute hovering reference input
     if params.use_u_ref_hovering:
-        u_hover = (
-            np.linalg.pinv(model.R(np.zeros(nx)).full() @ model.F)
+        u_hover = model.pinv_F @ (
+            model.R(np.zeros(nx)).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
     else:
@@ -961,6 +1114,7 @@ def define_ocpSafeAbort(
     ocp.solver_options.qp_solver = "PARTIAL_CONDENSING_HPIPM"
     ocp.solver_options.nlp_solver_type = "SQP"
     ocp.solver_options.nlp_solver_max_iter = params.nlp_solver_max_iter
+    ocp.solver_options.qp_solver_warm_start = 2
 
     return ocp
 
@@ -1074,15 +1228,10 @@ class NetSafeSet:
 
         # --- Load network weights ---
         nn_data = torch.load(
-            params.net_path, 
+            params.net_path,
             weights_only=False,
             map_location=params.device
         )
-        model_net = NeuralNetwork(
-            params.input_size, params.hidden_size, params.output_size,
-            params.number_hidden, params.act_fun, ub=1,
-        ).to(params.device)
-        model_net.load_state_dict(nn_data['model'])
 
         x_cp = model.amodel.x
         p_cp = model.amodel.p
@@ -1111,29 +1260,157 @@ class NetSafeSet:
         orient = (x_cp[npos:npos + nori] - nn_data['mean']) / nn_data['std']
 
         # Compute unit velocity direction (smoothed norm to avoid division by zero)
-        vel_norm = ca.sqrt(
-            ca.dot(x_cp[npos + nori:], x_cp[npos + nori:]) + params.eps ** 2
-        )
+        # sumsqr references the velocity slice once, unlike dot(v, v) which
+        # duplicates the slice subtree as both of its arguments
+        vel_norm = ca.sqrt(ca.sumsqr(x_cp[npos + nori:]) + params.eps ** 2)
         vel_dir = x_cp[npos + nori:] / vel_norm
 
         # Assemble network input: [box, orientation, velocity direction]
         state = ca.vertcat(box, orient, vel_dir)
 
-        # Wrap PyTorch model with l4casadi for CasADi compatibility
-        self.l4c_model = l4c.L4CasADi(
-            model_net,
-            device=params.device,
-            name=f'{params.robot_name}_model',
-            build_dir=params.build_dir,
-        )
+        # Wrap PyTorch model with l4casadi for CasADi compatibility.  The
+        # library is only rebuilt when the checkpoint is newer than the
+        # compiled artifact: MC workers then load the library the parent
+        # prebuilt instead of re-running codegen — and, crucially, instead
+        # of rewriting a file other processes have already dlopen'd.
+        lib_name = f'{params.robot_name}_model'
+        lib_path = os.path.join(params.build_dir, f'lib{lib_name}.so')
+        if (
+            os.path.exists(lib_path)
+            and os.path.getmtime(lib_path) >= os.path.getmtime(params.net_path)
+        ):
+            nn_fun = ca.external(lib_name, lib_path)
+        else:
+            # Deferred import: l4casadi pulls in its full build tool-chain
+            # at import time, which only actual rebuilds need to pay for
+            import l4casadi as l4c
+
+            model_net = NeuralNetwork(
+                params.input_size, params.hidden_size, params.output_size,
+                params.number_hidden, params.act_fun, ub=1,
+            ).to(params.device)
+            model_net.load_state_dict(nn_data['model'])
+
+            self.l4c_model = l4c.L4CasADi(
+                model_net,
+                device=params.device,
+                name=lib_name,
+                build_dir=params.build_dir,
+                # The OCP uses a Gauss-Newton Hessian, so the second-order
+                # derivatives of the network are never evaluated; skipping
+                # their generation roughly halves the l4casadi codegen time
+                generate_jac_jac=False,
+            )
+            nn_fun = self.l4c_model
 
         # NN constraint: output scaled by (1 - alpha/100) must exceed vel_norm
-        nn_model = self.l4c_model(state) * (100 - params.alpha) / 100 - vel_norm
+        nn_model = nn_fun(state) * (100 - params.alpha) / 100 - vel_norm
         self.nn_func = ca.Function(
             'nn_func', [model.amodel.x, model.amodel.p], [nn_model]
         )
 
 
+# Safe sets cached by checkpoint path and safety margin: rebuilding one
+# reloads the torch weights and re-traces the whole symbolic embedding,
+# which is pure overhead when every MC run shares the same network.
+_safe_set_cache: dict[tuple, NetSafeSet] = {}
+
+
+def _get_safe_set(model: SthModel, params: Params) -> NetSafeSet:
+    """Return the cached safe set, building it under an exclusive file lock.
+
+    Constructing :class:`NetSafeSet` may make l4casadi regenerate and
+    recompile the network library inside the shared ``params.build_dir``
+    (only when the checkpoint is newer than the compiled artifact — MC
+    workers normally find the parent's fresh prebuild and skip the compile).
+    The lock serialises the staleness check and any rebuild across worker
+    processes, so they cannot clobber each other's compile or a library
+    another process is loading.
+    """
+    key = (params.net_path, params.alpha)
+    safe_set = _safe_set_cache.get(key)
+    if safe_set is None:
+        lock_path = os.path.join(params.build_dir, "l4c_build.lock")
+        with open(lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                safe_set = NetSafeSet(model, params)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        _safe_set_cache[key] = safe_set
+    return safe_set
+
+
+# =============================================================================
+# SOLVER BUILD
+# =============================================================================
+
+def build_ocp_solver(
+    ocp: AcadosOcp,
+    params: Params,
+    json_file: str = "acados_ocp.json",
+) -> AcadosOcpSolver:
+    """Create the OCP solver, regenerating C code only when the config changed.
+
+    acados code generation and compilation dominate start-up time.  A hash
+    of every parameter that influences the generated code is stored next to
+    the solver JSON; when it matches on the next run, the previously
+    compiled solver library is reloaded instead of rebuilt.  Obstacles are
+    deliberately excluded: they enter only through the runtime box
+    parameter, not the generated code.
+
+    Parameters
+    ----------
+    ocp : AcadosOcp
+        Fully configured OCP description.
+    params : Params
+        Configuration object; all codegen-relevant fields are hashed.
+    json_file : str
+        Path of the solver JSON file.  The hash is stored alongside it.
+
+    Returns
+    -------
+    AcadosOcpSolver
+        A freshly built or reloaded solver instance.
+    """
+    cfg = (
+        params.N, params.Nvboc, params.dt,
+        params.mass, params.J.tolist(), params.l, params.cf, params.ct,
+        params.u_bar, params.alpha_tilt, params.maxRad,
+        params.Q.tolist(), params.R.tolist(),
+        params.x_ref.tolist(), params.use_u_ref_hovering,
+        params.terminal_const, params.net_path, params.alpha,
+        params.nlp_solver_max_iter, params.use_cython_solver,
+        ocp.solver_options.ext_fun_compile_flags,
+    )
+    cfg_hash = hashlib.sha1(repr(cfg).encode()).hexdigest()
+    hash_file = json_file.replace(".json", ".hash")
+
+    reuse = False
+    if os.path.exists(hash_file) and os.path.exists(json_file):
+        with open(hash_file) as f:
+            reuse = f.read().strip() == cfg_hash
+
+    # The Cython wrapper crosses the Python/C boundary far more cheaply than
+    # ctypes, which matters for the many set/get calls per MPC step
+    if reuse:
+        if params.use_cython_solver:
+            return AcadosOcpSolver.create_cython_solver(json_file)
+        return AcadosOcpSolver(
+            ocp, json_file=json_file, build=False, generate=False
+        )
+
+    if params.use_cython_solver:
+        AcadosOcpSolver.generate(ocp, json_file=json_file)
+        AcadosOcpSolver.build(ocp.code_export_directory, with_cython=True)
+        solver = AcadosOcpSolver.create_cython_solver(json_file)
+    else:
+        solver = AcadosOcpSolver(ocp, json_file=json_file)
+    with open(hash_file, "w") as f:
+        f.write(cfg_hash)
+    return solver
+
+
 # =============================================================================
 # BOX SELECTION
 # =============================================================================
@@ -1447,6 +1724,29 @@ def discretize_box_surface(
 # MPC + SIMULATION
 # =============================================================================
 
+# First feasible solution of the most recent run, reused to warm-start the
+# next run when its initial free-space box is close (per process, so also
+# valid inside MC worker processes).
+_warm_start_cache: Optional[dict] = None
+
+# Compiled OCP solvers reused across run_mpc calls: the OCP structure only
+# depends on the horizon lengths and terminal-constraint mode, while the
+# per-run environment enters purely through the box parameter, so rebuilding
+# the solvers for every MC run would redo identical codegen and allocation.
+_solver_cache: dict[tuple, tuple[AcadosOcpSolver, AcadosOcpSolver]] = {}
+
+# Simulation solver reused across run_mpc calls: the integrator depends only
+# on the model and the integration step, so each MC run can share one handle
+# instead of paying the acados create/destroy cost per run.
+_sim_cache: dict[tuple, AcadosSimSolver] = {}
+
+# Per-run scratch arrays (trajectory logs and shifted-guess buffers) reused
+# across run_mpc calls: the sizes are fixed by the configuration, so one
+# max-size allocation per process serves every run via slice views.  Safe
+# because each run pickles its trajectories before returning.
+_scratch_cache: dict[tuple, tuple[np.ndarray, ...]] = {}
+
+
 def run_mpc(
     model: SthModel,
     params: Params,
@@ -1481,11 +1781,18 @@ def run_mpc(
     result : RunResult
         Structured outcome for this run; see :class:`RunResult` for fields.
     """
+    global _warm_start_cache
+
     result = RunResult(run_id=run_id)
     wall_start = time.perf_counter()
 
-    # --- Build neural-network safe set ---
-    safe_set = NetSafeSet(model, params)
+    # --- Build neural-network safe set (vboc terminal mode only) ---
+    # The other modes never evaluate the network, so building it — and
+    # recompiling the l4casadi library — would be pure start-up overhead
+    safe_set = (
+        _get_safe_set(model, params)
+        if params.terminal_const == "vboc" else None
+    )
 
     # --- Discretise obstacles into sphere point clouds ---
     obsCenters = []
@@ -1510,18 +1817,30 @@ def run_mpc(
         obsCenters = np.empty((0, 3))
         obsRadii = np.empty((0,))
 
-    # --- Compile OCP solvers ---
-    ocp_tracking = define_ocp(model, params, safe_set)
-    ocpSafeAbort = define_ocpSafeAbort(model, params)
+    # --- Compile OCP solvers (reused across runs with the same structure) ---
+    solver_key = (params.N, params.Nvboc, params.terminal_const)
+    if solver_key not in _solver_cache:
+        ocp_tracking = define_ocp(model, params, safe_set)
+        ocpSafeAbort = define_ocpSafeAbort(model, params)
 
-    ctypes.CDLL(
-        os.path.join(params.build_dir, f'lib{params.robot_name}_model.so'),
-        mode=ctypes.RTLD_GLOBAL,
-    )
+        if safe_set is not None:
+            ctypes.CDLL(
+                os.path.join(params.build_dir, f'lib{params.robot_name}_model.so'),
+                mode=ctypes.RTLD_GLOBAL,
+            )
+
+        _solver_cache[solver_key] = (
+            build_ocp_solver(ocp_tracking, params, json_file="acados_ocp.json"),
+            build_ocp_solver(ocpSafeAbort, params,
+                             json_file="acados_ocp_safe_abort.json"),
+        )
 
-    solver = AcadosOcpSolver(ocp_tracking, json_file="acados_ocp.json")
-    solverSafeAbort = AcadosOcpSolver(ocpSafeAbort, json_file="acados_ocp_safe_abort.json")
-    sim_solver = create_acados_sim(model, params)
+    solver, solverSafeAbort = _solver_cache[solver_key]
+
+    sim_key = (params.robot_name, params.dt, params.nsub)
+    if sim_key not in _sim_cache:
+        _sim_cache[sim_key] = create_acados_sim(model, params)
+    sim_solver = _sim_cache[sim_key]
 
     x0_list = np.zeros((1, model.nx))
 
@@ -1530,13 +1849,29 @@ def run_mpc(
     # For a single initial condition the outer loop runs once
     for x0 in x0_list:
         x = x0.copy()
-        xg = [x.copy()]
-        ug = []
-        bg = []
+
+        # Pre-allocated trajectory logs: worst case is the full simulation
+        # horizon plus the safe-abort tail, trimmed to actual length below.
+        # The backing buffers live in _scratch_cache and are shared by all
+        # runs handled by this process.  The shift buffers stay separate
+        # from x_prev/u_prev, which the fallback input indexing still reads.
+        n_max = params.time.shape[0] + params.Nvboc
+        scratch_key = (n_max, params.N, model.nx, model.nu)
+        if scratch_key not in _scratch_cache:
+            _scratch_cache[scratch_key] = (
+                np.empty((n_max + 1, model.nx)),
+                np.empty((n_max, model.nu)),
+                np.empty((n_max, 6)),
+                np.empty((params.N + 1, model.nx)),
+                np.empty((params.N, model.nu)),
+            )
+        xg, ug, bg, x_shift_buf, u_shift_buf = _scratch_cache[scratch_key]
+        xg[0] = x
+        n_log = 0
 
         x_prev = np.full((params.N + 1, model.nx), x)
-        u0 = (
-            np.linalg.pinv(model.R(x).full() @ model.F)
+        u0 = model.pinv_F @ (
+            model.R(x).full().T
             @ np.array([0, 0, params.mass * params.g])
         )
         u_prev = np.full((params.N, model.nu), u0)
@@ -1558,6 +1893,19 @@ def run_mpc(
                 params.zlim[0], params.zlim[1],
             ])
 
+        # Reuse the previous run's first feasible plan as the initial guess
+        # when the environments are similar, instead of the constant hover
+        # guess: the SQP then starts near a solution and converges in far
+        # fewer iterations.
+        box0 = box.copy()
+        if (
+            _warm_start_cache is not None
+            and np.linalg.norm(box - _warm_start_cache["box"])
+                < params.warm_start_tau
+        ):
+            x_prev = _warm_start_cache["x_sol"].copy()
+            u_prev = _warm_start_cache["u_sol"].copy()
+
         initialize_guess(
             solver, params.N, model, params, x,
             u_guess=u_prev, x_guess=x_prev, p_guess=box,
@@ -1568,6 +1916,9 @@ def run_mpc(
         fails = 0
         follow_safe_abort = False
         u_safe_abort = None
+        # Resolve the terminal-constraint mode once; the string compare is
+        # loop-invariant
+        use_vboc = params.terminal_const == "vboc"
 
         for i in tqdm(range(params.time.shape[0]), desc="MPC Simulation Progress"):
             # ---- Collision check before applying the next input ----
@@ -1591,11 +1942,21 @@ def run_mpc(
             solve_ms = (time.perf_counter() - t0) * 1e3
             solve_times_ms.append(solve_ms)
 
-            x_sol = np.array([solver.get(k, "x") for k in range(params.N + 1)])
-            u_sol = np.array([solver.get(k, "u") for k in range(params.N)])
+            # Check the status first: the trajectory read-back (2(N+1) solver
+            # queries) is only useful when the solve actually succeeded
             feas = solver.get_status()
 
             if feas == 0:
+                x_sol = solver.get_flat("x").reshape(params.N + 1, model.nx)
+                u_sol = solver.get_flat("u").reshape(params.N, model.nu)
+
+                if _warm_start_cache is None or _warm_start_cache["run_id"] != run_id:
+                    _warm_start_cache = {
+                        "run_id": run_id,
+                        "box": box0,
+                        "x_sol": x_sol.copy(),
+                        "u_sol": u_sol.copy(),
+                    }
                 fails = 0
                 u_to_apply = u_sol[0]
                 x_prev = x_sol.copy()
@@ -1603,12 +1964,12 @@ def run_mpc(
             else:
                 result.n_infeasible_steps += 1
 
-                if fails == 0 and params.terminal_const == "vboc":
+                if fails == 0 and use_vboc:
                     # First failure: pre-compute safe-abort trajectory
                     print("Alert: MPC infeasibility detected.")
                     x_safe_start = x_prev[params.N, :]
-                    u_hover = (
-                        np.linalg.pinv(model.R(x_safe_start).full() @ model.F)
+                    u_hover = model.pinv_F @ (
+                        model.R(x_safe_start).full().T
                         @ np.array([0, 0, params.mass * params.g])
                     )
                     x_guess_abort = np.tile(x_safe_start, (params.Nvboc + 1, 1))
@@ -1622,12 +1983,12 @@ def run_mpc(
                         p_guess=box,
                     )
                     solverSafeAbort.solve_for_x0(x_safe_start, False, False)
-                    u_safe_abort = np.array([
-                        solverSafeAbort.get(k, "u") for k in range(params.Nvboc)
-                    ])
+                    u_safe_abort = solverSafeAbort.get_flat("u").reshape(
+                        params.Nvboc, model.nu
+                    )
 
                 if fails == params.N:
-                    if params.terminal_const == "vboc":
+                    if use_vboc:
                         print(f"Switching to safe abort trajectory at t={i * params.dt:.2f}s")
                         follow_safe_abort = True
                         result.failsafe_triggered = True
@@ -1640,7 +2001,7 @@ def run_mpc(
                 u_to_apply = u_prev[fails]
                 fails += 1
 
-            x_next = dynamicsSim(sim_solver, x, u_to_apply, params.nsub)
+            x_next = dynamicsSim(sim_solver, x, u_to_apply)
 
             # Update free-space box
             if len(obsCenters) > 0:
@@ -1658,18 +2019,21 @@ def run_mpc(
             if feas == 0:
                 rollback_guess(solver, model, params, x_next, p_current=box)
             else:
-                u_shifted = np.vstack([u_prev[1:], u_prev[-1]])
-                x_shifted = np.vstack([x_prev[1:], x_prev[-1]])
+                u_shift_buf[:-1] = u_prev[1:]
+                u_shift_buf[-1] = u_prev[-1]
+                x_shift_buf[:-1] = x_prev[1:]
+                x_shift_buf[-1] = x_prev[-1]
                 initialize_guess(
                     solver, params.N, model, params, x_next,
-                    u_guess=u_shifted, x_guess=x_shifted, p_guess=box,
+                    u_guess=u_shift_buf, x_guess=x_shift_buf, p_guess=box,
                 )
 
             x = x_next.copy()
             result.n_steps += 1
-            ug.append(u_to_apply)
-            xg.append(x_next.copy())
-            bg.append(box.copy())
+            ug[n_log] = u_to_apply
+            xg[n_log + 1] = x_next
+            bg[n_log] = box
+            n_log += 1
 
         # ---- Safe-abort phase ----
         if follow_safe_abort and u_safe_abort is not None:
@@ -1685,20 +2049,21 @@ def run_mpc(
                     failsafe_collision = True
                     break
 
-                x_next = dynamicsSim(sim_solver, x, u_safe_abort[j], params.nsub)
+                x_next = dynamicsSim(sim_solver, x, u_safe_abort[j])
                 x = x_next.copy()
                 result.n_steps += 1
-                ug.append(u_safe_abort[j])
-                xg.append(x_next.copy())
-                bg.append(box.copy())
+                ug[n_log] = u_safe_abort[j]
+                xg[n_log + 1] = x_next
+                bg[n_log] = box
+                n_log += 1
 
             if not failsafe_collision:
                 result.failsafe_success = True
                 result.fail_reason = FailReason.FAILSAFE_TRIGGERED
 
-        xg_all.append(np.asarray(xg))
-        ug_all.append(np.asarray(ug))
-        bg_all.append(np.asarray(bg))
+        xg_all.append(xg[:n_log + 1])
+        ug_all.append(ug[:n_log])
+        bg_all.append(bg[:n_log])
 
     # ---- Final outcome determination ----
     # Check goal at end of trajectory if not already flagged as a collision
@@ -1726,9 +2091,11 @@ def run_mpc(
         result.min_solve_time_ms = float(np.min(solve_times_ms))
 
     # ---- Persist trajectory ----
-    traj_path = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "data/trajectory.pkl"
+    # MC runs get a per-run file name so concurrent workers never collide
+    traj_name = (
+        "trajectory.pkl" if run_id < 0 else f"trajectory_run_{run_id:03d}.pkl"
     )
+    traj_path = os.path.join(_THIS_DIR, "data", traj_name)
     with open(traj_path, "wb") as f:
         pickle.dump({"xg": xg_all, "ug": ug_all, "bg": bg_all}, f,
                     protocol=pickle.HIGHEST_PROTOCOL)
@@ -1736,6 +2103,102 @@ def run_mpc(
     return result
 
 
+# =============================================================================
+# MC WORKERS
+# =============================================================================
+
+# Per-process state built once by the pool initializer (solver compilation and
+# model construction are amortised over all runs handled by the worker).
+_worker_model: Optional[SthModel] = None
+_worker_params: Optional[Params] = None
+
+# Shared directory where the parent process prebuilds the solver code once;
+# workers pick the compiled artifacts up from here instead of regenerating.
+_MC_CODEGEN_DIR = os.path.join(_THIS_DIR, "data", "mc_codegen")
+
+
+def _mc_prebuild_codegen(model: SthModel, params: Params) -> None:
+    """Generate and compile the OCP solver code once in the parent process.
+
+    Run before the worker pool is created: every worker then reloads the
+    compiled libraries via the config-hash check in :func:`build_ocp_solver`
+    rather than paying one full acados codegen + gcc pass per process.
+    """
+    os.makedirs(_MC_CODEGEN_DIR, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(_MC_CODEGEN_DIR)
+    try:
+        safe_set = (
+            _get_safe_set(model, params)
+            if params.terminal_const == "vboc" else None
+        )
+
+        ocp_tracking = define_ocp(model, params, safe_set)
+        ocpSafeAbort = define_ocpSafeAbort(model, params)
+
+        if safe_set is not None:
+            ctypes.CDLL(
+                os.path.join(params.build_dir, f'lib{params.robot_name}_model.so'),
+                mode=ctypes.RTLD_GLOBAL,
+            )
+
+        build_ocp_solver(ocp_tracking, params, json_file="acados_ocp.json")
+        build_ocp_solver(ocpSafeAbort, params,
+                         json_file="acados_ocp_safe_abort.json")
+        # The integrator must be prebuilt too: a worker-side sim build would
+        # write through the shared codegen directory concurrently with the
+        # other workers' builds and library loads
+        create_acados_sim(model, params)
+    finally:
+        os.chdir(cwd)
+
+
+def _mc_worker_init() -> None:
+    """Initialise a Monte Carlo worker process.
+
+    Builds the configuration and symbolic model once per process and moves
+    the working directory into a process-private folder so that concurrent
+    acados code generation / compilation does not clash between workers.
+    The parent's prebuilt solver artifacts are linked in so the worker
+    reloads them instead of compiling its own copy.
+    """
+    global _worker_model, _worker_params
+
+    _worker_params = Params()
+    _worker_model = SthModel(_worker_params)
+
+    work_dir = os.path.join(_THIS_DIR, "data", f"mc_worker_{os.getpid()}")
+    os.makedirs(work_dir, exist_ok=True)
+    os.chdir(work_dir)
+
+    for name in ("acados_ocp.json", "acados_ocp.hash",
+                 "acados_ocp_safe_abort.json", "acados_ocp_safe_abort.hash",
+                 "acados_sim.json", "acados_sim.hash"):
+        src = os.path.join(_MC_CODEGEN_DIR, name)
+        if os.path.exists(src):
+            shutil.copy(src, name)
+    gen_src = os.path.join(_MC_CODEGEN_DIR, "c_generated_code")
+    if os.path.isdir(gen_src) and not os.path.exists("c_generated_code"):
+        os.symlink(gen_src, "c_generated_code")
+
+
+def _mc_worker_run(run_id: int) -> RunResult:
+    """Execute a single MC run inside a worker process.
+
+    Parameters
+    ----------
+    run_id : int
+        Index of the MC run; also drives the obstacle randomisation seed.
+
+    Returns
+    -------
+    result : RunResult
+        Structured outcome of the run (picklable, sent back to the parent).
+    """
+    _worker_params.obstacles = randomize_obstacles(_worker_params, run_id)
+    return run_mpc(_worker_model, _worker_params, run_id=run_id)
+
+
 # =============================================================================
 # MC STATISTICS
 # =============================================================================
@@ -1764,7 +2227,25 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
         return
 
     # ---- Aggregate counters ----
-    n_success = sum(r.success for r in results)
+    # Pull each field into a flat array once, then reduce with boolean masks
+    # instead of re-scanning the result list per statistic
+    success = np.fromiter((r.success for r in results), dtype=bool, count=n)
+    failsafe = np.fromiter((r.failsafe_triggered for r in results), dtype=bool, count=n)
+    failsafe_ok = np.fromiter((r.failsafe_success for r in results), dtype=bool, count=n)
+    collision = np.fromiter((r.collision_detected for r in results), dtype=bool, count=n)
+    stepped = np.fromiter((r.n_steps > 0 for r in results), dtype=bool, count=n)
+    goal_time = np.fromiter(
+        (np.nan if r.goal_time is None else r.goal_time for r in results),
+        dtype=float, count=n,
+    )
+    collision_time = np.fromiter(
+        (np.nan if r.collision_time is None else r.collision_time for r in results),
+        dtype=float, count=n,
+    )
+    total_wall = np.fromiter((r.total_sim_time for r in results), dtype=float, count=n)
+    infeasible_steps = np.fromiter((r.n_infeasible_steps for r in results), dtype=np.int64, count=n)
+
+    n_success = int(np.count_nonzero(success))
     n_fail = n - n_success
 
     fail_counts: dict[FailReason, int] = {}
@@ -1772,18 +2253,16 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
         if not r.success:
             fail_counts[r.fail_reason] = fail_counts.get(r.fail_reason, 0) + 1
 
-    n_failsafe = sum(r.failsafe_triggered for r in results)
-    n_failsafe_ok = sum(r.failsafe_success for r in results)
-    n_collision = sum(r.collision_detected for r in results)
+    n_failsafe = int(np.count_nonzero(failsafe))
+    n_failsafe_ok = int(np.count_nonzero(failsafe_ok))
+    n_collision = int(np.count_nonzero(collision))
 
-    goal_times = [r.goal_time for r in results if r.success and r.goal_time is not None]
-    collision_times = [r.collision_time for r in results if r.collision_detected and r.collision_time is not None]
+    goal_times = goal_time[success & ~np.isnan(goal_time)]
+    collision_times = collision_time[collision & ~np.isnan(collision_time)]
 
-    avg_solve = [r.avg_solve_time_ms for r in results if r.n_steps > 0]
-    max_solve = [r.max_solve_time_ms for r in results if r.n_steps > 0]
-    min_solve = [r.min_solve_time_ms for r in results if r.n_steps > 0]
-    total_wall = [r.total_sim_time for r in results]
-    infeasible_steps = [r.n_infeasible_steps for r in results]
+    avg_solve = np.fromiter((r.avg_solve_time_ms for r in results), dtype=float, count=n)[stepped]
+    max_solve = np.fromiter((r.max_solve_time_ms for r in results), dtype=float, count=n)[stepped]
+    min_solve = np.fromiter((r.min_solve_time_ms for r in results), dtype=float, count=n)[stepped]
 
     W = 68  # total width of the box
 
@@ -1860,7 +2339,7 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
     lines.append(section("COLLISION STATISTICS"))
     lines.append(row("Runs with collision",
                      f"{n_collision:>5} / {n}  ({100*n_collision/n:5.1f} %)"))
-    if collision_times:
+    if collision_times.size:
         lines.append(row("Avg collision time [s]",   f"{np.mean(collision_times):.3f}"))
         lines.append(row("Earliest collision [s]",   f"{np.min(collision_times):.3f}"))
         lines.append(row("Latest collision [s]",     f"{np.max(collision_times):.3f}"))
@@ -1868,7 +2347,7 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
 
     # ---- Goal-reaching statistics ----
     lines.append(section("GOAL-REACHING (successful runs)"))
-    if goal_times:
+    if goal_times.size:
         lines.append(row("Avg time to goal [s]",  f"{np.mean(goal_times):.3f}"))
         lines.append(row("Min time to goal [s]",  f"{np.min(goal_times):.3f}"))
         lines.append(row("Max time to goal [s]",  f"{np.max(goal_times):.3f}"))
@@ -1879,7 +2358,7 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
 
     # ---- NLP solve-time statistics ----
     lines.append(section("NLP SOLVE TIMES (per step)"))
-    if avg_solve:
+    if avg_solve.size:
         lines.append(row("Mean of per-run averages [ms]", f"{np.mean(avg_solve):.3f}"))
         lines.append(row("Global maximum [ms]",           f"{np.max(max_solve):.3f}"))
         lines.append(row("Global minimum [ms]",           f"{np.min(min_solve):.3f}"))
@@ -1890,12 +2369,12 @@ def print_mc_statistics(results: list[RunResult], params: Params) -> None:
     lines.append(row("Avg infeasible steps per run",  f"{np.mean(infeasible_steps):.2f}"))
     lines.append(row("Max infeasible steps in a run", f"{int(np.max(infeasible_steps))}"))
     lines.append(row("Runs with ≥1 infeasible step",
-                     f"{sum(s > 0 for s in infeasible_steps):>5} / {n}"))
+                     f"{int(np.count_nonzero(infeasible_steps)):>5} / {n}"))
     lines.append(divider())
 
     # ---- Wall-clock timing ----
     lines.append(section("WALL-CLOCK TIMING"))
-    lines.append(row("Total wall time [s]",        f"{sum(total_wall):.2f}"))
+    lines.append(row("Total wall time [s]",        f"{np.sum(total_wall):.2f}"))
     lines.append(row("Avg wall time per run [s]",  f"{np.mean(total_wall):.2f}"))
     lines.append(row("Max wall time per run [s]",  f"{np.max(total_wall):.2f}"))
     lines.append(row("Min wall time per run [s]",  f"{np.min(total_wall):.2f}"))
@@ -1917,23 +2396,41 @@ if __name__ == "__main__":
         # ----------------------------------------------------------------
         # Monte Carlo mode: run mc_num simulations with random obstacles
         # ----------------------------------------------------------------
-        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        data_dir = os.path.join(_THIS_DIR, "data")
         os.makedirs(data_dir, exist_ok=True)
 
         mc_results: list[RunResult] = []
 
-        for run_id in tqdm(range(params.mc_num), desc="Monte Carlo runs"):
-            # Randomize obstacles for this run (deterministic per seed + run_id)
-            params.obstacles = randomize_obstacles(params, run_id)
-
-            result = run_mpc(model, params, run_id=run_id)
-            mc_results.append(result)
+        if params.mc_workers > 1:
+            # Runs are independent: farm them out to a process pool.  Each
+            # worker builds its own model and solvers once (see
+            # _mc_worker_init) and handles many runs, so the codegen cost is
+            # amortised and the OCP solves scale with core count.
+            # Compile the solver code once here; workers only reload it
+            _mc_prebuild_codegen(model, params)
+
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=params.mc_workers,
+                mp_context=ctx,
+                initializer=_mc_worker_init,
+            ) as pool:
+                # Batch several runs per IPC round-trip; individual runs are
+                # short enough that per-task dispatch overhead is visible
+                chunk = max(1, params.mc_num // (4 * params.mc_workers))
+                mc_results = list(tqdm(
+                    pool.map(_mc_worker_run, range(params.mc_num),
+                             chunksize=chunk),
+                    total=params.mc_num,
+                    desc="Monte Carlo runs",
+                ))
+        else:
+            for run_id in tqdm(range(params.mc_num), desc="Monte Carlo runs"):
+                # Randomize obstacles for this run (deterministic per seed + run_id)
+                params.obstacles = randomize_obstacles(params, run_id)
 
-            # Rename the saved trajectory to avoid overwriting
-            src = os.path.join(data_dir, "trajectory.pkl")
-            dst = os.path.join(data_dir, f"trajectory_run_{run_id:03d}.pkl")
-            if os.path.exists(src):
-                os.replace(src, dst)
+                result = run_mpc(model, params, run_id=run_id)
+                mc_results.append(result)
 
         # ---- Save MC statistics ----
         stats_path = os.path.join(data_dir, "mc_statistics.pkl")
@@ -1973,7 +2470,5 @@ if __name__ == "__main__":
 
         print("\nSimulation completed. Trajectory saved to 'data/trajectory.pkl'.")
 
-        traj_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "data/trajectory.pkl"
-        )
+        traj_path = os.path.join(_THIS_DIR, "data/trajectory.pkl")
         plotter(traj_path, model, params, animate=True)
\ No newline at end of file
@@ -5,6 +5,14 @@ from matplotlib.ticker import MultipleLocator
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 
 
+# Unit-sphere mesh shared by all sphere redraws: only the scaling and the
+# translation change per frame, so the trigonometry is evaluated once here
+_U_GRID, _V_GRID = np.mgrid[0:2 * np.pi:20j, 0:np.pi:10j]
+_SPHERE_X = np.cos(_U_GRID) * np.sin(_V_GRID)
+_SPHERE_Y = np.sin(_U_GRID) * np.sin(_V_GRID)
+_SPHERE_Z = np.cos(_V_GRID)
+
+
 # =============================================================================
 # ROTATION UTILITIES
 # =============================================================================
@@ -117,11 +125,11 @@ def rotor_disc(
     t1 /= np.linalg.norm(t1)
     t2 = np.cross(normal, t1)
 
+    # One broadcast outer product instead of a Python loop over theta
     theta = np.linspace(0, 2 * np.pi, n_points)
-    circle_pts = np.array([
-        center + radius * (np.cos(t) * t1 + np.sin(t) * t2)
-        for t in theta
-    ])
+    circle_pts = center + radius * (
+        np.outer(np.cos(theta), t1) + np.outer(np.sin(theta), t2)
+    )
 
     # Vertex 0 is the centre; vertices 1…n_points are on the circumference
     x = np.hstack([center[0], circle_pts[:, 0]])
@@ -253,11 +261,10 @@ def update(
         sphere_surf[0] = None
 
     if params.maxRad > 0:
-        u_grid, v_grid = np.mgrid[0:2 * np.pi:20j, 0:np.pi:10j]
         r = params.maxRad
-        xs = p[0] + r * np.cos(u_grid) * np.sin(v_grid)
-        ys = p[1] + r * np.sin(u_grid) * np.sin(v_grid)
-        zs = p[2] + r * np.cos(v_grid)
+        xs = p[0] + r * _SPHERE_X
+        ys = p[1] + r * _SPHERE_Y
+        zs = p[2] + r * _SPHERE_Z
         sphere_surf[0] = ax.plot_surface(
             xs, ys, zs, color="cyan", alpha=0.2, linewidth=0
         )
@@ -352,12 +359,11 @@ def animator(
 
     for obs in obstacles:
         if obs["type"] == "sphere":
-            u_grid, v_grid = np.mgrid[0:2 * np.pi:20j, 0:np.pi:10j]
             c, r = obs["center"], obs["radius"]
             ax.plot_surface(
-                c[0] + r * np.cos(u_grid) * np.sin(v_grid),
-                c[1] + r * np.sin(u_grid) * np.sin(v_grid),
-                c[2] + r * np.cos(v_grid),
+                c[0] + r * _SPHERE_X,
+                c[1] + r * _SPHERE_Y,
+                c[2] + r * _SPHERE_Z,
                 color="gray", alpha=0.3, linewidth=0,
             )
 